@@ -1,13 +1,19 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from cachetools import TTLCache
+import redis.asyncio as aioredis
+import orjson
 import os
 import logging
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timedelta
@@ -15,9 +21,15 @@ import google.generativeai as genai
 from enum import Enum
 import jwt
 import bcrypt
-import json
-import random
-import string
+import secrets
+
+try:
+    # Drop-in libuv event loop: noticeably higher throughput for the
+    # async fan-out endpoints; the stdlib loop remains the fallback
+    import uvloop
+    uvloop.install()
+except ImportError:
+    uvloop = None
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -25,24 +37,54 @@ load_dotenv(ROOT_DIR / '.env')
 # Configure Gemini API
 genai.configure(api_key=os.environ.get('GEMINI_API_KEY'))
 
-# MongoDB connection
+# The model handle is stateless and safe to share; constructing it per
+# request just re-pays object setup on every call
+GEMINI_MODEL = genai.GenerativeModel('gemini-1.5-flash')
+
+# Cap on in-flight Gemini calls per bot; unbounded fan-out trips API 429s
+# whose retries then amplify the load. 16 suits flash; tune via env.
+GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', '16'))
+
+# MongoDB connection. The client is created in a startup handler rather
+# than at import so its internal state binds to the event loop that
+# actually serves requests (uvloop under uvicorn, not the import-time loop).
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+# Optional Redis cache for read-heavy endpoints; disabled when REDIS_URL
+# is not configured so local setups keep working without Redis
+REDIS_URL = os.environ.get('REDIS_URL')
+redis_client = aioredis.from_url(REDIS_URL) if REDIS_URL else None
 
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-super-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24
 
-# Create the main app without a prefix
-app = FastAPI()
+# Create the main app without a prefix; serialize all responses with orjson
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 # Security
-security = HTTPBearer()
+# auto_error=False so a missing Authorization header gets the same 401 as an
+# invalid token, instead of HTTPBearer's default 403
+security = HTTPBearer(auto_error=False)
+
+# Short-TTL cache for the teacher dashboard: a page refresh re-runs the
+# full multi-query join otherwise, and seconds of staleness is acceptable
+_teacher_dashboard_cache = TTLCache(maxsize=1000, ttl=15)
+
+# Students we already checked (or alerted on) recently; an active student
+# would otherwise trigger an alerts lookup on every single chat message
+_alert_checked = TTLCache(maxsize=10000, ttl=3600)
+
+# Profile snapshots used only as LLM prompt context in chat, where 30s of
+# staleness is invisible. Dashboards keep reading live documents because
+# their counters must reflect the write that just happened.
+_profile_cache = TTLCache(maxsize=10000, ttl=30)
 
 # Enums
 class GradeLevel(str, Enum):
@@ -79,6 +121,14 @@ class QuestionType(str, Enum):
     LONG_ANSWER = "long_answer"
     NUMERICAL = "numerical"
 
+# Models
+def uuid4_str() -> str:
+    return str(uuid.uuid4())
+
+class MongoModel(BaseModel):
+    """Base for documents persisted in Mongo: dump enums as raw values."""
+    model_config = ConfigDict(use_enum_values=True, populate_by_name=True)
+
 # Auth Models
 class UserCreate(BaseModel):
     email: str
@@ -92,8 +142,8 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
-class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class User(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     email: str
     name: str
     user_type: UserType
@@ -104,8 +154,8 @@ class User(BaseModel):
     is_active: bool = True
 
 # Enhanced Student Models
-class StudentProfile(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class StudentProfile(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     user_id: str
     student_id: str
     name: str
@@ -119,13 +169,15 @@ class StudentProfile(BaseModel):
     last_active: datetime = Field(default_factory=datetime.utcnow)
     total_study_time: int = 0  # in minutes
     streak_days: int = 0
+    subjects_studied: List[Subject] = []
+    total_messages: int = 0
     total_xp: int = 0
     level: int = 1
     badges: List[str] = []
     joined_classes: List[str] = []
 
-class TeacherProfile(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class TeacherProfile(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     user_id: str
     teacher_id: str
     name: str
@@ -137,8 +189,8 @@ class TeacherProfile(BaseModel):
     last_active: datetime = Field(default_factory=datetime.utcnow)
 
 # Class Management Models
-class ClassRoom(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class ClassRoom(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     class_id: str
     join_code: str
     teacher_id: str
@@ -154,8 +206,8 @@ class JoinClassRequest(BaseModel):
     join_code: str
 
 # Chat and Learning Models
-class ChatMessage(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class ChatMessage(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     session_id: str
     student_id: str
     subject: Subject
@@ -168,8 +220,8 @@ class ChatMessage(BaseModel):
     confidence_score: Optional[float] = None
     learning_points: List[str] = []
 
-class ChatSession(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class ChatSession(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     session_id: str
     student_id: str
     subject: Subject
@@ -180,8 +232,8 @@ class ChatSession(BaseModel):
     session_summary: str = ""
 
 # Practice Test Models
-class PracticeQuestion(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class PracticeQuestion(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     subject: Subject
     topics: List[str]
     question_type: QuestionType
@@ -199,8 +251,8 @@ class PracticeTestRequest(BaseModel):
     difficulty: DifficultyLevel
     question_count: int = Field(ge=5, le=50)
 
-class PracticeAttempt(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class PracticeAttempt(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     student_id: str
     test_id: str
     questions: List[str]
@@ -210,8 +262,8 @@ class PracticeAttempt(BaseModel):
     completed_at: datetime = Field(default_factory=datetime.utcnow)
 
 # Notification Models
-class Notification(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class Notification(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     recipient_id: str
     sender_id: Optional[str] = None
     title: str
@@ -221,8 +273,8 @@ class Notification(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 # Calendar Models
-class CalendarEvent(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class CalendarEvent(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     student_id: str
     title: str
     description: Optional[str] = None
@@ -234,8 +286,8 @@ class CalendarEvent(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 # Mindfulness Models
-class MindfulnessActivity(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class MindfulnessActivity(MongoModel):
+    id: str = Field(default_factory=uuid4_str)
     student_id: str
     activity_type: str  # "breathing", "meditation", "stress_relief", "study_break"
     duration: int  # minutes
@@ -251,42 +303,104 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+# Pre-encoded key bytes plus a short-lived claims cache: a client hammering
+# the API with the same bearer token skips the per-request HMAC entirely.
+# The 60s TTL is far below token expiry, so expired tokens still lapse.
+_JWT_KEY_BYTES = JWT_SECRET.encode()
+_token_cache = TTLCache(maxsize=10000, ttl=60)
+
+def verify_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    token = credentials.credentials
+    payload = _token_cache.get(token)
+    if payload is not None:
         return payload
+    try:
+        payload = jwt.decode(token, _JWT_KEY_BYTES, algorithms=[JWT_ALGORITHM])
     except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    _token_cache[token] = payload
+    return payload
+
+# Raw-string comparisons: UserType is a str-Enum, so comparing .value hits
+# CPython's interned-string fast path instead of Enum.__eq__ dispatch
+_STUDENT = UserType.STUDENT.value
+_TEACHER = UserType.TEACHER.value
+
+def require_student(token_data: dict = Depends(verify_token)):
+    if token_data.get('user_type') != _STUDENT:
+        raise HTTPException(status_code=403, detail="Student access required")
+    return token_data
+
+def require_teacher(token_data: dict = Depends(verify_token)):
+    if token_data.get('user_type') != _TEACHER:
+        raise HTTPException(status_code=403, detail="Teacher access required")
+    return token_data
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+# bcrypt takes ~100ms by design and releases the GIL while hashing, so
+# run it in a worker thread instead of stalling the event loop
+async def hash_password(password: str) -> str:
+    return await asyncio.to_thread(
+        lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    )
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+async def verify_password(password: str, hashed: str) -> bool:
+    return await asyncio.to_thread(
+        bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8')
+    )
 
 def generate_join_code() -> str:
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+    # One CSPRNG call instead of six Python-level random draws; also makes
+    # join codes non-guessable, which random.choices never was
+    return secrets.token_hex(3).upper()
 
 # AI Bot Classes
+# Subject-specific curriculum knowledge (NCERT-based); static data, shared
+# by every SubjectBot instead of being rebuilt per message
+SUBJECT_CURRICULUM = {
+    Subject.MATH: {
+        "topics": ["Algebra", "Geometry", "Trigonometry", "Calculus", "Statistics", "Probability"],
+        "approach": "Step-by-step problem solving with visual aids when possible"
+    },
+    Subject.PHYSICS: {
+        "topics": ["Mechanics", "Thermodynamics", "Waves", "Optics", "Electricity", "Magnetism", "Modern Physics"],
+        "approach": "Concept-based learning with real-world applications and experiments"
+    },
+    Subject.CHEMISTRY: {
+        "topics": ["Atomic Structure", "Periodic Table", "Chemical Bonding", "Acids & Bases", "Organic Chemistry", "Physical Chemistry"],
+        "approach": "Practical understanding with chemical equations and reactions"
+    },
+    Subject.BIOLOGY: {
+        "topics": ["Cell Biology", "Genetics", "Evolution", "Ecology", "Human Physiology", "Plant Biology"],
+        "approach": "Visual learning with diagrams and life processes"
+    },
+    Subject.ENGLISH: {
+        "topics": ["Grammar", "Literature", "Poetry", "Essay Writing", "Reading Comprehension", "Creative Writing"],
+        "approach": "Language skills development through practice and analysis"
+    },
+    Subject.HISTORY: {
+        "topics": ["Ancient History", "Medieval History", "Modern History", "World Wars", "Indian Independence", "Civilizations"],
+        "approach": "Timeline-based learning with cause-and-effect relationships"
+    },
+    Subject.GEOGRAPHY: {
+        "topics": ["Physical Geography", "Human Geography", "Climate", "Maps", "Natural Resources", "Population"],
+        "approach": "Map-based learning with real-world connections"
+    }
+}
+
 class CentralBrainBot:
-    def __init__(self):
-        self.api_key = os.environ.get('GEMINI_API_KEY')
-        
-    async def analyze_and_route(self, message: str, session_id: str, student_profile=None):
-        """Analyze user message and determine which bot should handle it"""
-        profile_context = ""
-        if student_profile:
-            profile_context = f"Student Profile: Grade {student_profile.get('grade_level')}, Subjects: {student_profile.get('subjects')}, Current Level: {student_profile.get('level', 1)}"
-            
-        system_prompt = f"""You are the Central Brain of Project K, an AI educational tutor system. 
+    SYSTEM_INSTRUCTION = """You are the Central Brain of Project K, an AI educational tutor system.
         Your job is to analyze student messages and determine which subject-specific bot should handle them.
-        
-        {profile_context}
-        
+
         Available subjects: Math, Physics, Chemistry, Biology, English, History, Geography
         Available activities: Study, Practice Tests, Mindfulness, Review
         
@@ -311,68 +425,43 @@ class CentralBrainBot:
         - General conversation: Handle yourself with encouragement
         
         Always be encouraging and supportive. Remember, you're helping middle and high school students."""
-        
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        chat = model.start_chat(history=[])
-        
-        response = await asyncio.to_thread(
-            chat.send_message,
-            f"System: {system_prompt}\n\nUser: {message}"
+
+    def __init__(self):
+        # The static instructions ride on the model as system_instruction;
+        # only the per-student context is built per call
+        self.model = genai.GenerativeModel(
+            'gemini-1.5-flash', system_instruction=self.SYSTEM_INSTRUCTION
         )
-        
+        self._sem = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+    async def analyze_and_route(self, message: str, session_id: str, student_profile=None):
+        """Analyze user message and determine which bot should handle it"""
+        prompt = message
+        if student_profile:
+            prompt = (
+                f"Student Profile: Grade {student_profile.get('grade_level')}, "
+                f"Subjects: {student_profile.get('subjects')}, "
+                f"Current Level: {student_profile.get('level', 1)}\n\n{message}"
+            )
+
+        # Native async call: the event loop multiplexes the LLM round-trip
+        # instead of parking a default-executor thread on it
+        async with self._sem:
+            response = await self.model.generate_content_async(prompt)
+
         return response.text
 
 class SubjectBot:
     def __init__(self, subject: Subject):
         self.subject = subject
-        self.api_key = os.environ.get('GEMINI_API_KEY')
-        
-    async def teach_subject(self, message: str, session_id: str, student_profile=None, conversation_history=None):
-        """Teach subject using Socratic method with personalized approach"""
-        
-        # Subject-specific curriculum knowledge (NCERT-based)
-        curriculum_data = {
-            Subject.MATH: {
-                "topics": ["Algebra", "Geometry", "Trigonometry", "Calculus", "Statistics", "Probability"],
-                "approach": "Step-by-step problem solving with visual aids when possible"
-            },
-            Subject.PHYSICS: {
-                "topics": ["Mechanics", "Thermodynamics", "Waves", "Optics", "Electricity", "Magnetism", "Modern Physics"],
-                "approach": "Concept-based learning with real-world applications and experiments"
-            },
-            Subject.CHEMISTRY: {
-                "topics": ["Atomic Structure", "Periodic Table", "Chemical Bonding", "Acids & Bases", "Organic Chemistry", "Physical Chemistry"],
-                "approach": "Practical understanding with chemical equations and reactions"
-            },
-            Subject.BIOLOGY: {
-                "topics": ["Cell Biology", "Genetics", "Evolution", "Ecology", "Human Physiology", "Plant Biology"],
-                "approach": "Visual learning with diagrams and life processes"
-            },
-            Subject.ENGLISH: {
-                "topics": ["Grammar", "Literature", "Poetry", "Essay Writing", "Reading Comprehension", "Creative Writing"],
-                "approach": "Language skills development through practice and analysis"
-            },
-            Subject.HISTORY: {
-                "topics": ["Ancient History", "Medieval History", "Modern History", "World Wars", "Indian Independence", "Civilizations"],
-                "approach": "Timeline-based learning with cause-and-effect relationships"
-            },
-            Subject.GEOGRAPHY: {
-                "topics": ["Physical Geography", "Human Geography", "Climate", "Maps", "Natural Resources", "Population"],
-                "approach": "Map-based learning with real-world connections"
-            }
-        }
-        
-        profile_context = ""
-        if student_profile:
-            profile_context = f"Student: Grade {student_profile.get('grade_level')}, Level {student_profile.get('level', 1)}, XP: {student_profile.get('total_xp', 0)}"
-            
-        curriculum = curriculum_data.get(self.subject, {"topics": [], "approach": "General teaching"})
-        
-        system_prompt = f"""You are the {self.subject.value.title()} Bot of Project K, a specialized AI tutor for middle and high school {self.subject.value}.
+        curriculum = SUBJECT_CURRICULUM.get(subject, {"topics": [], "approach": "General teaching"})
 
-        {profile_context}
-        
-        Subject Focus: {self.subject.value.title()}
+        # The full teaching prompt only varies by subject, so build it once
+        # here and hand it to the model as system_instruction; per-message
+        # calls then carry just the student context and question
+        self.system_instruction = f"""You are the {subject.value.title()} Bot of Project K, a specialized AI tutor for middle and high school {subject.value}.
+
+        Subject Focus: {subject.value.title()}
         Key Topics: {', '.join(curriculum['topics'])}
         Teaching Approach: {curriculum['approach']}
 
@@ -384,30 +473,39 @@ class SubjectBot:
         5. Always encourage and build confidence
         6. Adapt difficulty based on student's grade level and performance
         7. Reference NCERT curriculum when appropriate
-        
+
         Response format:
         - Start with a brief encouraging comment
         - Ask a guiding question or give a hint
         - If they're stuck, provide a step-by-step explanation
         - End with a question to check understanding
         - Suggest related practice if appropriate
-        
-        Remember: You're helping students LEARN, not just getting answers. Make {self.subject.value} feel approachable and fun!"""
-        
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        chat = model.start_chat(history=[])
-        
-        response = await asyncio.to_thread(
-            chat.send_message,
-            f"System: {system_prompt}\n\nUser: {message}"
+
+        Remember: You're helping students LEARN, not just getting answers. Make {subject.value} feel approachable and fun!"""
+
+        self.model = genai.GenerativeModel(
+            'gemini-1.5-flash', system_instruction=self.system_instruction
         )
-        
+        self._sem = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+    async def teach_subject(self, message: str, session_id: str, student_profile=None, conversation_history=None):
+        """Teach subject using Socratic method with personalized approach"""
+        prompt = message
+        if student_profile:
+            prompt = (
+                f"Student: Grade {student_profile.get('grade_level')}, "
+                f"Level {student_profile.get('level', 1)}, "
+                f"XP: {student_profile.get('total_xp', 0)}\n\n{message}"
+            )
+
+        # Native async call: the event loop multiplexes the LLM round-trip
+        # instead of parking a default-executor thread on it
+        async with self._sem:
+            response = await self.model.generate_content_async(prompt)
+
         return response.text
 
 class PracticeTestBot:
-    def __init__(self):
-        self.api_key = os.environ.get('GEMINI_API_KEY')
-        
     async def generate_practice_questions(self, subject: Subject, topics: List[str], difficulty: DifficultyLevel, count: int = 5):
         """Generate adaptive practice questions"""
         
@@ -439,8 +537,7 @@ class PracticeTestBot:
         
         Make questions NCERT curriculum aligned and age-appropriate. Ensure variety in question types and difficulty within the specified level."""
         
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = await asyncio.to_thread(model.generate_content, system_prompt)
+        response = await GEMINI_MODEL.generate_content_async(system_prompt)
         
         try:
             # Extract JSON from response
@@ -448,7 +545,7 @@ class PracticeTestBot:
             start_idx = response_text.find('[')
             end_idx = response_text.rfind(']') + 1
             json_str = response_text[start_idx:end_idx]
-            questions_data = json.loads(json_str)
+            questions_data = orjson.loads(json_str)
             
             # Create PracticeQuestion objects
             questions = []
@@ -467,7 +564,7 @@ class PracticeTestBot:
                 questions.append(question)
             
             return questions
-        except (json.JSONDecodeError, KeyError) as e:
+        except (orjson.JSONDecodeError, KeyError) as e:
             # Fallback to simple questions if JSON parsing fails
             return await self._generate_fallback_questions(subject, topics, difficulty, count)
 
@@ -507,12 +604,12 @@ practice_bot = PracticeTestBot()
 async def register_user(user_data: UserCreate):
     """Register a new user (student or teacher)"""
     # Check if email already exists
-    existing_user = await db.users.find_one({"email": user_data.email})
+    existing_user = await db.users.find_one({"email": user_data.email}, {"_id": 1})
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     
     # Create user
     user = User(
@@ -523,30 +620,35 @@ async def register_user(user_data: UserCreate):
         school_name=user_data.school_name
     )
     
-    # Store user with hashed password
-    user_dict = user.dict()
+    # Dump the validated model once and reuse it for both the insert and
+    # the response. insert_one mutates its argument by attaching _id, so
+    # hand Mongo a copy and keep the response dict clean.
+    user_dict = user.model_dump()
     user_dict['password'] = hashed_password
-    await db.users.insert_one(user_dict)
-    
-    # Create profile based on user type
+    await db.users.insert_one(dict(user_dict))
+    user_dict.pop('password')
+
+    # Create profile based on user type. Every field here was already
+    # validated on the UserCreate body, so skip a second validation pass
+    # (model_construct) and never copy the plaintext password around.
     if user_data.user_type == UserType.STUDENT:
-        student_profile = StudentProfile(
+        student_profile = StudentProfile.model_construct(
             user_id=user.id,
             student_id=user.id,
             name=user_data.name,
             email=user_data.email,
             grade_level=user_data.grade_level
         )
-        await db.student_profiles.insert_one(student_profile.dict())
+        await db.student_profiles.insert_one(student_profile.model_dump())
     else:
-        teacher_profile = TeacherProfile(
+        teacher_profile = TeacherProfile.model_construct(
             user_id=user.id,
             teacher_id=user.id,
             name=user_data.name,
             email=user_data.email,
             school_name=user_data.school_name or "Unknown School"
         )
-        await db.teacher_profiles.insert_one(teacher_profile.dict())
+        await db.teacher_profiles.insert_one(teacher_profile.model_dump())
     
     # Create access token
     access_token = create_access_token({"sub": user.id, "email": user.email, "user_type": user_data.user_type})
@@ -554,7 +656,7 @@ async def register_user(user_data: UserCreate):
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "user": user,
+        "user": user_dict,
         "user_type": user_data.user_type
     }
 
@@ -562,8 +664,8 @@ async def register_user(user_data: UserCreate):
 async def login_user(login_data: UserLogin):
     """Login user"""
     # Find user
-    user_doc = await db.users.find_one({"email": login_data.email})
-    if not user_doc or not verify_password(login_data.password, user_doc['password']):
+    user_doc = await db.users.find_one({"email": login_data.email}, {"_id": 0})
+    if not user_doc or not await verify_password(login_data.password, user_doc['password']):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     user = User(**user_doc)
@@ -586,22 +688,18 @@ async def login_user(login_data: UserLogin):
 
 # Student Routes
 @api_router.get("/student/profile")
-async def get_student_profile(token_data: dict = Depends(verify_token)):
+async def get_student_profile(token_data: dict = Depends(require_student)):
     """Get current student profile"""
-    if token_data.get('user_type') != 'student':
-        raise HTTPException(status_code=403, detail="Student access required")
     
-    profile = await db.student_profiles.find_one({"user_id": token_data['sub']})
+    profile = await db.student_profiles.find_one({"user_id": token_data['sub']}, {"_id": 0})
     if not profile:
         raise HTTPException(status_code=404, detail="Student profile not found")
     
     return StudentProfile(**profile)
 
 @api_router.put("/student/profile")
-async def update_student_profile(updates: Dict[str, Any], token_data: dict = Depends(verify_token)):
+async def update_student_profile(updates: Dict[str, Any], token_data: dict = Depends(require_student)):
     """Update student profile"""
-    if token_data.get('user_type') != 'student':
-        raise HTTPException(status_code=403, detail="Student access required")
     
     updates['last_active'] = datetime.utcnow()
     result = await db.student_profiles.update_one(
@@ -611,18 +709,17 @@ async def update_student_profile(updates: Dict[str, Any], token_data: dict = Dep
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Student profile not found")
-    
-    profile = await db.student_profiles.find_one({"user_id": token_data['sub']})
+
+    _profile_cache.pop(token_data['sub'], None)
+    profile = await db.student_profiles.find_one({"user_id": token_data['sub']}, {"_id": 0})
     return StudentProfile(**profile)
 
 # Teacher Routes
 @api_router.get("/teacher/profile")
-async def get_teacher_profile(token_data: dict = Depends(verify_token)):
+async def get_teacher_profile(token_data: dict = Depends(require_teacher)):
     """Get current teacher profile"""
-    if token_data.get('user_type') != 'teacher':
-        raise HTTPException(status_code=403, detail="Teacher access required")
     
-    profile = await db.teacher_profiles.find_one({"user_id": token_data['sub']})
+    profile = await db.teacher_profiles.find_one({"user_id": token_data['sub']}, {"_id": 0})
     if not profile:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
     
@@ -630,18 +727,20 @@ async def get_teacher_profile(token_data: dict = Depends(verify_token)):
 
 # Class Management Routes
 @api_router.post("/teacher/classes")
-async def create_class(class_data: Dict[str, Any], token_data: dict = Depends(verify_token)):
+async def create_class(class_data: Dict[str, Any], token_data: dict = Depends(require_teacher)):
     """Create a new class"""
-    if token_data.get('user_type') != 'teacher':
-        raise HTTPException(status_code=403, detail="Teacher access required")
     
     # Generate unique join code
     join_code = generate_join_code()
-    while await db.classrooms.find_one({"join_code": join_code}):
+    while await db.classrooms.find_one({"join_code": join_code}, {"_id": 1}):
         join_code = generate_join_code()
     
+    # One UUID serves as both primary id and public class_id; the duplicated
+    # field names stay because clients and queries key on class_id
+    class_uuid = uuid4_str()
     classroom = ClassRoom(
-        class_id=str(uuid.uuid4()),
+        id=class_uuid,
+        class_id=class_uuid,
         join_code=join_code,
         teacher_id=token_data['sub'],
         subject=Subject(class_data['subject']),
@@ -650,223 +749,402 @@ async def create_class(class_data: Dict[str, Any], token_data: dict = Depends(ve
         description=class_data.get('description', '')
     )
     
-    await db.classrooms.insert_one(classroom.dict())
+    await db.classrooms.insert_one(classroom.model_dump())
     
     # Update teacher's classes
     await db.teacher_profiles.update_one(
         {"user_id": token_data['sub']},
         {"$push": {"classes_created": classroom.class_id}}
     )
-    
+
+    # The cached dashboard no longer reflects the class list
+    _teacher_dashboard_cache.pop(token_data['sub'], None)
+
     return classroom
 
 @api_router.get("/teacher/classes")
-async def get_teacher_classes(token_data: dict = Depends(verify_token)):
+async def get_teacher_classes(token_data: dict = Depends(require_teacher)):
     """Get all classes created by teacher"""
-    if token_data.get('user_type') != 'teacher':
-        raise HTTPException(status_code=403, detail="Teacher access required")
     
-    classes = await db.classrooms.find({"teacher_id": token_data['sub']}).to_list(100)
+    classes = await db.classrooms.find({"teacher_id": token_data['sub']}, {"_id": 0}).to_list(100)
     return [ClassRoom(**cls) for cls in classes]
 
 @api_router.post("/student/join-class")
-async def join_class(request: JoinClassRequest, token_data: dict = Depends(verify_token)):
+async def join_class(request: JoinClassRequest, token_data: dict = Depends(require_student)):
     """Student joins a class using join code"""
-    if token_data.get('user_type') != 'student':
-        raise HTTPException(status_code=403, detail="Student access required")
-    
-    # Find class by join code
-    classroom = await db.classrooms.find_one({"join_code": request.join_code, "is_active": True})
-    if not classroom:
-        raise HTTPException(status_code=404, detail="Invalid join code")
-    
-    # Add student to class
     student_id = token_data['sub']
-    if student_id not in classroom['students']:
-        await db.classrooms.update_one(
-            {"join_code": request.join_code},
-            {"$push": {"students": student_id}}
+
+    # Atomically enroll the student: one find_one_and_update replaces the
+    # racy find + membership check + update sequence (two concurrent joins
+    # could both pass the check and double-push)
+    classroom = await db.classrooms.find_one_and_update(
+        {"join_code": request.join_code, "is_active": True, "students": {"$ne": student_id}},
+        {"$addToSet": {"students": student_id}},
+        return_document=ReturnDocument.AFTER,
+        projection={"_id": 0}
+    )
+    if classroom is None:
+        # Distinguish a bad code from an already-enrolled student
+        classroom = await db.classrooms.find_one(
+            {"join_code": request.join_code, "is_active": True}, {"_id": 0}
         )
-        
+        if not classroom:
+            raise HTTPException(status_code=404, detail="Invalid join code")
+    else:
         # Update student's joined classes
         await db.student_profiles.update_one(
             {"user_id": student_id},
-            {"$push": {"joined_classes": classroom['class_id']}}
+            {"$addToSet": {"joined_classes": classroom['class_id']}}
         )
-    
+        _profile_cache.pop(student_id, None)
+
     return {"message": "Successfully joined class", "class": ClassRoom(**classroom)}
 
 @api_router.get("/student/classes")
-async def get_student_classes(token_data: dict = Depends(verify_token)):
+async def get_student_classes(token_data: dict = Depends(require_student)):
     """Get all classes joined by student"""
-    if token_data.get('user_type') != 'student':
-        raise HTTPException(status_code=403, detail="Student access required")
     
-    student_profile = await db.student_profiles.find_one({"user_id": token_data['sub']})
-    if not student_profile:
+    # One $lookup joins the profile's joined_classes to classrooms server-
+    # side, replacing the profile read + second $in query round-trip pair
+    rows = await db.student_profiles.aggregate([
+        {"$match": {"user_id": token_data['sub']}},
+        {"$lookup": {
+            "from": "classrooms",
+            "localField": "joined_classes",
+            "foreignField": "class_id",
+            "as": "classes",
+            "pipeline": [{"$match": {"is_active": True}}, {"$project": {"_id": 0}}],
+        }},
+        {"$project": {"_id": 0, "classes": 1}},
+    ]).to_list(1)
+    if not rows:
         return []
-    
-    class_ids = student_profile.get('joined_classes', [])
-    classes = await db.classrooms.find({"class_id": {"$in": class_ids}}).to_list(100)
-    return [ClassRoom(**cls) for cls in classes]
+    return [ClassRoom(**cls) for cls in rows[0]['classes']]
+
+# Chat-message write batching: bursts of messages (rapid senders, many
+# concurrent students) are coalesced into one insert_many round-trip.
+# The queue is created on startup so it binds to the serving event loop.
+_chat_write_queue: Optional[asyncio.Queue] = None
+_chat_writer_task: Optional[asyncio.Task] = None
+CHAT_WRITE_BATCH_SIZE = 32
+CHAT_WRITE_BATCH_WINDOW = 0.05  # seconds
+
+def _log_write_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.error(f"Post-chat write failed: {task.exception()}")
+
+async def save_chat_message(doc: Dict[str, Any]):
+    """Insert a chat message, batching with concurrent inserts when possible"""
+    if _chat_write_queue is None:
+        await db.chat_messages.insert_one(doc)
+        return
+    future = asyncio.get_running_loop().create_future()
+    await _chat_write_queue.put((doc, future))
+    await future
+
+async def _chat_message_writer():
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _chat_write_queue.get()]
+        deadline = loop.time() + CHAT_WRITE_BATCH_WINDOW
+        while len(batch) < CHAT_WRITE_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_chat_write_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        try:
+            await db.chat_messages.insert_many([doc for doc, _ in batch], ordered=False)
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+async def check_student_alerts(student_id: str, student_profile: Optional[Dict[str, Any]] = None):
+    """Alert a student's teachers when the student shows very low chat activity"""
+    if student_id in _alert_checked:
+        return
+    try:
+        # Only the "fewer than 3 messages in the last week" threshold
+        # matters; the $gte bound keeps the scan inside the recent slice of
+        # the (student_id, timestamp) index and limit=3 stops at the third
+        # match without transferring documents
+        cutoff = datetime.utcnow() - timedelta(days=7)
+        recent_count = await db.chat_messages.count_documents(
+            {"student_id": student_id, "timestamp": {"$gte": cutoff}}, limit=3
+        )
+        if recent_count >= 3:
+            _alert_checked[student_id] = True
+            return
+
+        class_ids = (student_profile or {}).get('joined_classes', [])
+        if not class_ids:
+            _alert_checked[student_id] = True
+            return
+
+        classrooms = await db.classrooms.find(
+            {"class_id": {"$in": class_ids}}, {"teacher_id": 1}
+        ).to_list(100)
+
+        for teacher_id in {cls['teacher_id'] for cls in classrooms}:
+            existing = await db.alerts.find_one({
+                "teacher_id": teacher_id,
+                "student_id": student_id,
+                "alert_type": "LOW_ACTIVITY",
+                "is_read": False
+            })
+            if existing:
+                continue
+            await db.alerts.insert_one({
+                "id": uuid4_str(),
+                "teacher_id": teacher_id,
+                "student_id": student_id,
+                "alert_type": "LOW_ACTIVITY",
+                "message": "This student is just getting started and may need extra support",
+                "is_read": False,
+                "created_at": datetime.utcnow()
+            })
+        _alert_checked[student_id] = True
+    except Exception as e:
+        # Task runs detached from the request; never let it raise
+        logger.error(f"Error checking student alerts: {str(e)}")
 
 # Chat Routes
 @api_router.post("/chat/session")
 async def create_chat_session(session_data: Dict[str, Any], token_data: dict = Depends(verify_token)):
     """Create a new chat session"""
-    session = ChatSession(
-        session_id=str(uuid.uuid4()),
+    # Fields are produced server-side (the subject is validated by the
+    # Subject() call), so skip the redundant Pydantic validation pass
+    session_uuid = uuid4_str()
+    session = ChatSession.model_construct(
+        id=session_uuid,
+        session_id=session_uuid,
         student_id=token_data['sub'],
-        subject=Subject(session_data['subject'])
+        subject=Subject(session_data['subject']).value
     )
-    await db.chat_sessions.insert_one(session.dict())
+    await db.chat_sessions.insert_one(session.model_dump())
     return session
 
+def _queue_chat_writes(student_id: str, session_id: str, subject: Subject,
+                       user_message: str, bot_response: str, bot_type: str,
+                       student_profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Schedule the post-chat persistence and return the message document.
+
+    The response only needs the LLM answer; the message insert, session
+    bump, XP update and cache invalidation are independent writes, so they
+    run as a gathered background task instead of stacking their round-trips
+    on user-facing latency. Failures surface through the done-callback.
+    """
+    # Every field is already validated by the caller, so construct without
+    # re-running Pydantic validation and serialize once (the insert gets a
+    # copy because the driver attaches _id to its argument)
+    message_doc = ChatMessage.model_construct(
+        session_id=session_id,
+        student_id=student_id,
+        subject=subject.value,
+        user_message=user_message,
+        bot_response=bot_response,
+        bot_type=bot_type
+    ).model_dump()
+
+    now = datetime.utcnow()
+    writes = [
+        save_chat_message(dict(message_doc)),
+        db.chat_sessions.update_one(
+            {"session_id": session_id},
+            {
+                "$set": {"last_active": now},
+                "$inc": {"total_messages": 1}
+            }
+        ),
+    ]
+    if student_profile:
+        xp_earned = 5  # Base XP for asking questions
+        writes.append(db.student_profiles.update_one(
+            {"user_id": student_id},
+            {
+                "$inc": {"total_xp": xp_earned, "total_messages": 1},
+                "$addToSet": {"subjects_studied": subject.value},
+                "$set": {"last_active": now}
+            }
+        ))
+    if redis_client:
+        # A new message invalidates the cached dashboard for this student
+        writes.append(redis_client.delete(f"dash:{student_id}"))
+
+    write_task = asyncio.create_task(asyncio.gather(*writes))
+    write_task.add_done_callback(_log_write_failure)
+
+    # The caller never needs the alert outcome; run it off the hot path
+    asyncio.create_task(check_student_alerts(student_id, student_profile))
+
+    return message_doc
+
 @api_router.post("/chat/message")
 async def send_chat_message(message_data: Dict[str, Any], token_data: dict = Depends(verify_token)):
     """Send a message and get AI response"""
-    try:
-        # Get student profile for context
-        student_profile = await db.student_profiles.find_one({"user_id": token_data['sub']})
-        
-        # Get conversation history for context
-        conversation_history = await db.chat_messages.find(
-            {"session_id": message_data['session_id']}
-        ).sort("timestamp", -1).limit(10).to_list(10)
-        
-        subject = Subject(message_data['subject'])
-        user_message = message_data['user_message']
-        
-        # Route to appropriate subject bot
-        if subject in subject_bots:
-            bot_response = await subject_bots[subject].teach_subject(
-                user_message, message_data['session_id'], student_profile, conversation_history
-            )
-            bot_type = f"{subject.value}_bot"
-        else:
-            # Handle with central brain
-            central_response = await central_brain.analyze_and_route(
-                user_message, message_data['session_id'], student_profile
-            )
-            bot_response = central_response
-            bot_type = "central_brain"
-        
-        # Create and save the message
-        message_obj = ChatMessage(
-            session_id=message_data['session_id'],
-            student_id=token_data['sub'],
-            subject=subject,
-            user_message=user_message,
-            bot_response=bot_response,
-            bot_type=bot_type
+    # Get student profile for context (cached: only the LLM prompt reads it)
+    student_profile = _profile_cache.get(token_data['sub'])
+    if student_profile is None:
+        student_profile = await db.student_profiles.find_one({"user_id": token_data['sub']}, {"_id": 0})
+        if student_profile:
+            _profile_cache[token_data['sub']] = student_profile
+    
+    # Get conversation history for context
+    conversation_history = await db.chat_messages.find(
+        {"session_id": message_data['session_id']},
+        {"_id": 0, "user_message": 1, "bot_response": 1, "timestamp": 1}
+    ).sort("timestamp", -1).limit(10).to_list(10)
+    
+    subject = Subject(message_data['subject'])
+    user_message = message_data['user_message']
+    
+    # Route to the subject bot directly: Subject() above already rejected
+    # unknown subjects, and every Subject has a bot, so the central-brain
+    # fallback branch was dead code
+    bot_response = await subject_bots[subject].teach_subject(
+        user_message, message_data['session_id'], student_profile, conversation_history
+    )
+    bot_type = f"{subject.value}_bot"
+
+    # Persist off the response path and return the local document
+    return _queue_chat_writes(
+        token_data['sub'], message_data['session_id'], subject,
+        user_message, bot_response, bot_type, student_profile
+    )
+
+@api_router.post("/chat/message/stream")
+async def stream_chat_message(message_data: Dict[str, Any], token_data: dict = Depends(verify_token)):
+    """Send a message and stream the AI response as server-sent events.
+
+    The JSON endpoint above stays for clients that want the stored
+    document; this one trades that for first-token latency — the user
+    sees output as Gemini produces it instead of after full generation.
+    """
+    student_profile = _profile_cache.get(token_data['sub'])
+    if student_profile is None:
+        student_profile = await db.student_profiles.find_one({"user_id": token_data['sub']}, {"_id": 0})
+        if student_profile:
+            _profile_cache[token_data['sub']] = student_profile
+
+    subject = Subject(message_data['subject'])
+    user_message = message_data['user_message']
+    bot = subject_bots[subject]
+
+    prompt = user_message
+    if student_profile:
+        prompt = (
+            f"Student: Grade {student_profile.get('grade_level')}, "
+            f"Level {student_profile.get('level', 1)}, "
+            f"XP: {student_profile.get('total_xp', 0)}\n\n{user_message}"
         )
-        
-        await db.chat_messages.insert_one(message_obj.dict())
-        
-        # Update session activity
-        await db.chat_sessions.update_one(
-            {"session_id": message_data['session_id']},
-            {
-                "$set": {"last_active": datetime.utcnow()},
-                "$inc": {"total_messages": 1}
-            }
+
+    async def event_stream():
+        parts = []
+        async with bot._sem:
+            response = await bot.model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield b"data: " + orjson.dumps({"delta": chunk.text}) + b"\n\n"
+        # Persist the full exchange once the stream has finished
+        _queue_chat_writes(
+            token_data['sub'], message_data['session_id'], subject,
+            user_message, "".join(parts), f"{subject.value}_bot", student_profile
         )
-        
-        # Award XP for engagement
-        if student_profile:
-            xp_earned = 5  # Base XP for asking questions
-            await db.student_profiles.update_one(
-                {"user_id": token_data['sub']},
-                {
-                    "$inc": {"total_xp": xp_earned},
-                    "$set": {"last_active": datetime.utcnow()}
-                }
-            )
-        
-        return message_obj
-        
-    except Exception as e:
-        logger.error(f"Error in chat message: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
+        yield b"data: [DONE]\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 
 @api_router.get("/chat/history")
-async def get_chat_history(subject: Optional[str] = None, token_data: dict = Depends(verify_token)):
-    """Get chat history for a student, optionally filtered by subject"""
+async def get_chat_history(
+    subject: Optional[str] = None,
+    limit: int = 50,
+    before: Optional[datetime] = None,
+    token_data: dict = Depends(verify_token)
+):
+    """Get chat history for a student, optionally filtered by subject.
+
+    Paginated: returns at most `limit` (capped at 200) messages older than
+    `before`, in chronological order. Pass the oldest timestamp of the
+    previous page as `before` to walk further back.
+    """
     query = {"student_id": token_data['sub']}
     if subject:
         query["subject"] = subject
-        
-    messages = await db.chat_messages.find(query).sort("timestamp", 1).to_list(1000)
-    return [ChatMessage(**message) for message in messages]
+    if before:
+        query["timestamp"] = {"$lt": before}
+
+    limit = min(max(limit, 1), 200)
+    messages = await db.chat_messages.find(query, {"_id": 0}).sort("timestamp", -1).limit(limit).to_list(limit)
+    messages.reverse()
+    return messages
 
 # Practice Test Routes
 @api_router.post("/practice/generate")
 async def generate_practice_test(request: PracticeTestRequest, token_data: dict = Depends(verify_token)):
     """Generate practice questions"""
-    try:
-        questions = await practice_bot.generate_practice_questions(
-            request.subject, request.topics, request.difficulty, request.question_count
-        )
-        
-        # Store questions in database
-        question_ids = []
-        for question in questions:
-            await db.practice_questions.insert_one(question.dict())
-            question_ids.append(question.id)
-        
-        return {
-            "test_id": str(uuid.uuid4()),
-            "questions": questions,
-            "total_questions": len(questions)
-        }
-    except Exception as e:
-        logger.error(f"Error generating practice test: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error generating practice test: {str(e)}")
+    questions = await practice_bot.generate_practice_questions(
+        request.subject, request.topics, request.difficulty, request.question_count
+    )
+
+    # Store questions in database
+    question_ids = []
+    for question in questions:
+        await db.practice_questions.insert_one(question.model_dump())
+        question_ids.append(question.id)
+
+    return {
+        "test_id": str(uuid.uuid4()),
+        "questions": questions,
+        "total_questions": len(questions)
+    }
 
 @api_router.post("/practice/submit")
 async def submit_practice_test(test_data: Dict[str, Any], token_data: dict = Depends(verify_token)):
     """Submit practice test answers"""
-    try:
-        # Calculate score
-        total_questions = len(test_data['questions'])
-        correct_answers = 0
-        
-        for question_id, student_answer in test_data['student_answers'].items():
-            question = await db.practice_questions.find_one({"id": question_id})
-            if question and question['correct_answer'].lower() == student_answer.lower():
-                correct_answers += 1
-        
-        score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
-        
-        # Create attempt record
-        attempt = PracticeAttempt(
-            student_id=token_data['sub'],
-            test_id=test_data['test_id'],
-            questions=test_data['questions'],
-            student_answers=test_data['student_answers'],
-            score=score,
-            time_taken=test_data.get('time_taken', 0)
-        )
-        
-        await db.practice_attempts.insert_one(attempt.dict())
-        
-        # Award XP based on score
-        xp_earned = int(score / 10) * 5  # 5 XP per 10% score
-        await db.student_profiles.update_one(
-            {"user_id": token_data['sub']},
-            {"$inc": {"total_xp": xp_earned}}
-        )
-        
-        return {
-            "score": score,
-            "correct_answers": correct_answers,
-            "total_questions": total_questions,
-            "xp_earned": xp_earned
-        }
-        
-    except Exception as e:
-        logger.error(f"Error submitting practice test: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error submitting practice test: {str(e)}")
+    # Calculate score
+    total_questions = len(test_data['questions'])
+    correct_answers = 0
+
+    for question_id, student_answer in test_data['student_answers'].items():
+        question = await db.practice_questions.find_one({"id": question_id}, {"_id": 0, "correct_answer": 1})
+        if question and question['correct_answer'].lower() == student_answer.lower():
+            correct_answers += 1
+
+    score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
+
+    # Create attempt record
+    attempt = PracticeAttempt(
+        student_id=token_data['sub'],
+        test_id=test_data['test_id'],
+        questions=test_data['questions'],
+        student_answers=test_data['student_answers'],
+        score=score,
+        time_taken=test_data.get('time_taken', 0)
+    )
+
+    await db.practice_attempts.insert_one(attempt.model_dump())
+
+    # Award XP based on score
+    xp_earned = int(score / 10) * 5  # 5 XP per 10% score
+    await db.student_profiles.update_one(
+        {"user_id": token_data['sub']},
+        {"$inc": {"total_xp": xp_earned}}
+    )
+
+    return {
+        "score": score,
+        "correct_answers": correct_answers,
+        "total_questions": total_questions,
+        "xp_earned": xp_earned
+    }
 
 # Mindfulness Routes
 @api_router.post("/mindfulness/session")
@@ -879,7 +1157,7 @@ async def start_mindfulness_session(session_data: Dict[str, Any], token_data: di
         mood_before=session_data.get('mood_before'),
         mood_after=session_data.get('mood_after')
     )
-    await db.mindfulness_activities.insert_one(session.dict())
+    await db.mindfulness_activities.insert_one(session.model_dump())
     
     # Award XP for mindfulness activity
     await db.student_profiles.update_one(
@@ -892,14 +1170,96 @@ async def start_mindfulness_session(session_data: Dict[str, Any], token_data: di
 @api_router.get("/mindfulness/activities")
 async def get_mindfulness_history(token_data: dict = Depends(verify_token)):
     """Get mindfulness activity history"""
-    activities = await db.mindfulness_activities.find({"student_id": token_data['sub']}).sort("completed_at", -1).to_list(50)
+    activities = await db.mindfulness_activities.find({"student_id": token_data['sub']}, {"_id": 0}).sort("completed_at", -1).to_list(50)
     return [MindfulnessActivity(**activity) for activity in activities]
 
 # Notification Routes
+@api_router.post("/notifications/send")
+async def send_notification(notification_data: Dict[str, Any], token_data: dict = Depends(require_teacher)):
+    """Send a notification from a teacher to one or more students"""
+
+    recipient_ids = notification_data.get('recipient_ids', [])
+    if not recipient_ids:
+        raise HTTPException(status_code=400, detail="No recipients specified")
+
+    # model_construct: the per-recipient documents differ only in ids, so
+    # a full validation pass per recipient buys nothing
+    docs = [
+        Notification.model_construct(
+            recipient_id=recipient_id,
+            sender_id=token_data['sub'],
+            title=notification_data['title'],
+            message=notification_data['message'],
+            type=notification_data.get('type', 'teacher_message')
+        ).model_dump()
+        for recipient_id in recipient_ids
+    ]
+    # One bulk round-trip for the whole recipient list; ordered=False lets
+    # the server apply the inserts in parallel
+    await db.notifications.insert_many(docs, ordered=False)
+    return {
+        "message": f"Notification sent to {len(docs)} recipients",
+        "notification_ids": [doc['id'] for doc in docs]
+    }
+
+@api_router.post("/notifications/daily-practice-reminders")
+async def send_daily_practice_reminders(token_data: dict = Depends(require_teacher)):
+    """Send each recently active student a reminder for their most-studied subject"""
+
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # Server-side join: active students minus those already reminded today,
+    # in one round-trip instead of a find plus a distinct()
+    needy = await db.student_profiles.aggregate([
+        {"$match": {"last_active": {"$gte": week_ago}}},
+        {"$lookup": {
+            "from": "notifications",
+            "let": {"sid": "$user_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$recipient_id", "$$sid"]},
+                    {"$eq": ["$type", "reminder"]},
+                    {"$gte": ["$created_at", today_start]},
+                ]}}},
+                {"$limit": 1},
+            ],
+            "as": "reminded",
+        }},
+        {"$match": {"reminded": {"$size": 0}}},
+        {"$project": {"_id": 0, "user_id": 1}},
+    ]).to_list(None)
+    needy_ids = [student['user_id'] for student in needy]
+    if not needy_ids:
+        return {"message": "No students need reminders", "sent": 0}
+
+    # One aggregation computes every student's top subject; Mongo does the
+    # counting instead of a find-and-tally round-trip per student
+    rows = await db.chat_messages.aggregate([
+        {"$match": {"student_id": {"$in": needy_ids}, "timestamp": {"$gte": week_ago}}},
+        {"$group": {"_id": {"student": "$student_id", "subject": "$subject"}, "n": {"$sum": 1}}},
+        {"$sort": {"n": -1}},
+        {"$group": {"_id": "$_id.student", "top": {"$first": "$_id.subject"}}},
+    ]).to_list(None)
+
+    pending = [
+        Notification.model_construct(
+            recipient_id=row["_id"],
+            title="Daily Practice Reminder",
+            message=f"Time to practice some {row['top']} questions!",
+            type="reminder"
+        ).model_dump()
+        for row in rows
+    ]
+    if pending:
+        await db.notifications.insert_many(pending, ordered=False)
+
+    return {"message": f"Sent {len(pending)} practice reminders", "sent": len(pending)}
+
 @api_router.get("/notifications")
 async def get_notifications(token_data: dict = Depends(verify_token)):
     """Get user notifications"""
-    notifications = await db.notifications.find({"recipient_id": token_data['sub']}).sort("created_at", -1).to_list(50)
+    notifications = await db.notifications.find({"recipient_id": token_data['sub']}, {"_id": 0}).sort("created_at", -1).to_list(50)
     return [Notification(**notification) for notification in notifications]
 
 @api_router.put("/notifications/{notification_id}/read")
@@ -925,49 +1285,70 @@ async def create_calendar_event(event_data: Dict[str, Any], token_data: dict = D
         end_time=datetime.fromisoformat(event_data['end_time'])
     )
     
-    await db.calendar_events.insert_one(event.dict())
+    await db.calendar_events.insert_one(event.model_dump())
     return event
 
 @api_router.get("/calendar/events")
 async def get_calendar_events(token_data: dict = Depends(verify_token)):
     """Get user's calendar events"""
-    events = await db.calendar_events.find({"student_id": token_data['sub']}).sort("start_time", 1).to_list(100)
+    events = await db.calendar_events.find({"student_id": token_data['sub']}, {"_id": 0}).sort("start_time", 1).to_list(100)
     return [CalendarEvent(**event) for event in events]
 
 # Dashboard Routes
 @api_router.get("/dashboard")
-async def get_student_dashboard(token_data: dict = Depends(verify_token)):
+async def get_student_dashboard(token_data: dict = Depends(require_student)):
     """Get comprehensive dashboard data for a student"""
-    if token_data.get('user_type') != 'student':
-        raise HTTPException(status_code=403, detail="Student access required")
     
-    profile = await db.student_profiles.find_one({"user_id": token_data['sub']})
+    cache_key = f"dash:{token_data['sub']}"
+    if redis_client:
+        cached = await redis_client.get(cache_key)
+        if cached:
+            return orjson.loads(cached)
+
+    today = datetime.now().date()
+    today_start = datetime.combine(today, datetime.min.time())
+    today_end = datetime.combine(today + timedelta(days=1), datetime.min.time())
+
+    # All five queries are independent of each other; fan them out
+    # concurrently so the dashboard pays max(RTT) instead of sum(RTT)
+    (
+        profile,
+        recent_messages,
+        recent_sessions,
+        today_events,
+        notifications,
+    ) = await asyncio.gather(
+        db.student_profiles.find_one({"user_id": token_data['sub']}, {"_id": 0}),
+        # The activity feed shows a snippet, not the full exchange: project
+        # the metadata plus a server-side truncated question and leave the
+        # long bot_response strings out of the payload entirely
+        db.chat_messages.find(
+            {"student_id": token_data['sub']},
+            {"_id": 0, "session_id": 1, "subject": 1, "bot_type": 1, "timestamp": 1,
+             "user_message": {"$substrCP": ["$user_message", 0, 120]}}
+        ).sort("timestamp", -1).limit(10).to_list(10),
+        db.chat_sessions.find({"student_id": token_data['sub']}, {"_id": 0}).sort("last_active", -1).limit(5).to_list(5),
+        db.calendar_events.find(
+            {"student_id": token_data['sub'], "start_time": {"$gte": today_start, "$lt": today_end}},
+            {"_id": 0, "id": 1, "title": 1, "event_type": 1, "subject": 1,
+             "start_time": 1, "end_time": 1, "is_completed": 1}
+        ).sort("start_time", 1).to_list(10),
+        db.notifications.find(
+            {"recipient_id": token_data['sub'], "is_read": False},
+            {"_id": 0, "id": 1, "title": 1, "message": 1, "type": 1, "created_at": 1}
+        ).to_list(10),
+    )
     if not profile:
         raise HTTPException(status_code=404, detail="Student not found")
-    
-    # Get recent activity
-    recent_messages = await db.chat_messages.find({"student_id": token_data['sub']}).sort("timestamp", -1).limit(10).to_list(10)
-    recent_sessions = await db.chat_sessions.find({"student_id": token_data['sub']}).sort("last_active", -1).limit(5).to_list(5)
-    
-    # Calculate study stats
-    total_messages = await db.chat_messages.count_documents({"student_id": token_data['sub']})
-    subjects_studied = await db.chat_messages.distinct("subject", {"student_id": token_data['sub']})
-    
-    # Get today's events
-    today = datetime.now().date()
-    today_events = await db.calendar_events.find({
-        "student_id": token_data['sub'],
-        "start_time": {
-            "$gte": datetime.combine(today, datetime.min.time()),
-            "$lt": datetime.combine(today + timedelta(days=1), datetime.min.time())
-        }
-    }).to_list(10)
-    
-    # Get notifications
-    notifications = await db.notifications.find({"recipient_id": token_data['sub'], "is_read": False}).to_list(10)
-    
-    return {
-        "profile": StudentProfile(**profile),
+
+    # Both study stats are maintained incrementally on the profile now
+    total_messages = profile.get("total_messages", 0)
+    subjects_studied = profile.get("subjects_studied", [])
+
+    # Every document was projected without _id, so return the raw dicts:
+    # re-validating them through Pydantic models here only burned CPU
+    dashboard = {
+        "profile": profile,
         "stats": {
             "total_messages": total_messages,
             "subjects_studied": len(subjects_studied),
@@ -976,51 +1357,100 @@ async def get_student_dashboard(token_data: dict = Depends(verify_token)):
             "level": profile.get("level", 1)
         },
         "recent_activity": {
-            "messages": [ChatMessage(**msg) for msg in recent_messages],
-            "sessions": [ChatSession(**session) for session in recent_sessions]
+            "messages": recent_messages,
+            "sessions": recent_sessions
         },
-        "today_events": [CalendarEvent(**event) for event in today_events],
-        "notifications": [Notification(**notification) for notification in notifications],
+        "today_events": today_events,
+        "notifications": notifications,
         "subjects_progress": subjects_studied
     }
 
+    if redis_client:
+        await redis_client.set(cache_key, orjson.dumps(dashboard), ex=20)
+
+    return dashboard
+
 @api_router.get("/teacher/dashboard")
-async def get_teacher_dashboard(token_data: dict = Depends(verify_token)):
+async def get_teacher_dashboard(token_data: dict = Depends(require_teacher)):
     """Get comprehensive dashboard data for a teacher"""
-    if token_data.get('user_type') != 'teacher':
-        raise HTTPException(status_code=403, detail="Teacher access required")
-    
-    profile = await db.teacher_profiles.find_one({"user_id": token_data['sub']})
+
+    cached = _teacher_dashboard_cache.get(token_data['sub'])
+    if cached is not None:
+        return cached
+
+    # Profile and class list are independent; fetch them in one overlap
+    profile, classes = await asyncio.gather(
+        db.teacher_profiles.find_one({"user_id": token_data['sub']}, {"_id": 0}),
+        db.classrooms.find({"teacher_id": token_data['sub']}, {"_id": 0}).to_list(100),
+    )
     if not profile:
         raise HTTPException(status_code=404, detail="Teacher not found")
-    
-    # Get teacher's classes
-    classes = await db.classrooms.find({"teacher_id": token_data['sub']}).to_list(100)
-    
-    # Get analytics for all students in teacher's classes
-    all_student_ids = []
-    for cls in classes:
-        all_student_ids.extend(cls.get('students', []))
-    
+
+
+    # Get analytics for all students in teacher's classes (deduplicated:
+    # a student can appear in several of the teacher's classes)
+    all_student_ids = list({sid for cls in classes for sid in cls.get('students', [])})
+
     # Get student activity data
-    total_students = len(set(all_student_ids)) if all_student_ids else 0
+    total_students = len(all_student_ids)
     recent_activity = []
-    
+    students = []
+
     if all_student_ids:
-        recent_activity = await db.chat_messages.find(
-            {"student_id": {"$in": all_student_ids}}
-        ).sort("timestamp", -1).limit(20).to_list(20)
-    
-    return {
+        # The roster, per-student stats and activity feed are independent
+        # queries; overlap their round-trips instead of awaiting serially
+        students, stat_rows, recent_activity = await asyncio.gather(
+            db.student_profiles.find(
+                {"user_id": {"$in": all_student_ids}}, {"_id": 0}
+            ).to_list(100),
+            db.chat_messages.aggregate([
+                {"$match": {"student_id": {"$in": all_student_ids}}},
+                {"$group": {"_id": "$student_id", "total": {"$sum": 1}, "last": {"$max": "$timestamp"}}}
+            ]).to_list(None),
+            db.chat_messages.aggregate([
+                {"$match": {"student_id": {"$in": all_student_ids}}},
+                {"$sort": {"timestamp": -1}},
+                {"$limit": 20},
+                # The feed only shows a snippet; truncate server-side so
+                # full message bodies never cross the wire
+                {"$project": {
+                    "_id": 0,
+                    "student_id": 1,
+                    "subject": 1,
+                    "bot_type": 1,
+                    "timestamp": 1,
+                    "preview": {"$substrCP": ["$user_message", 0, 50]},
+                }},
+            ]).to_list(20),
+        )
+
+        # Per-student chat stats from one aggregation instead of per-student queries
+        stats = {row["_id"]: row for row in stat_rows}
+        for student in students:
+            student_stats = stats.get(student["user_id"])
+            student["total_messages"] = student_stats["total"] if student_stats else 0
+            student["last_activity"] = student_stats["last"] if student_stats else None
+
+        # Dict index for the activity feed: O(1) per row instead of
+        # scanning the roster list for every message
+        students_by_id = {s['user_id']: s for s in students}
+        for activity in recent_activity:
+            student = students_by_id.get(activity['student_id'])
+            activity['student_name'] = student['name'] if student else "Unknown"
+
+    dashboard = {
         "profile": TeacherProfile(**profile),
         "classes": [ClassRoom(**cls) for cls in classes],
+        "students": students,
         "stats": {
             "total_classes": len(classes),
             "total_students": total_students,
             "recent_activity_count": len(recent_activity)
         },
-        "recent_activity": [ChatMessage(**msg) for msg in recent_activity]
+        "recent_activity": recent_activity
     }
+    _teacher_dashboard_cache[token_data['sub']] = dashboard
+    return dashboard
 
 # Health check routes
 @api_router.get("/")
@@ -1049,6 +1479,83 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Last-resort handler so routes don't need broad try/except blocks"""
+    logger.exception(f"Unhandled error on {request.url.path}")
+    return JSONResponse(status_code=500, content={"detail": "Internal server error"})
+
+@app.on_event("startup")
+async def size_default_executor():
+    """Size the asyncio.to_thread pool explicitly.
+
+    bcrypt hashing runs on the default executor; its stock cap of
+    min(32, cpus + 4) becomes the ceiling on concurrent logins, so make
+    it deliberate and overridable instead of an interpreter default.
+    """
+    workers = int(os.environ.get('THREAD_POOL_SIZE', str((os.cpu_count() or 1) * 5)))
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=workers))
+
+# Startup handlers run in registration order: connect first, then the
+# index pass and the chat writer can use the live client
+@app.on_event("startup")
+async def connect_db():
+    """Create the Motor client on the event loop that serves requests"""
+    global client, db
+    client = AsyncIOMotorClient(
+        mongo_url,
+        uuidRepresentation="standard",
+        maxPoolSize=int(os.environ.get('MONGO_POOL', '200')),
+        minPoolSize=20,
+        waitQueueTimeoutMS=2000,
+        serverSelectionTimeoutMS=3000,
+        # Wire compression shrinks the chatty dashboard payloads; pymongo
+        # quietly skips any compressor whose library isn't installed
+        compressors="zstd,snappy,zlib",
+    )
+    db = client[os.environ['DB_NAME']]
+
+@app.on_event("startup")
+async def ensure_indexes():
+    """Create the indexes backing the hot per-student query patterns"""
+    await asyncio.gather(
+        db.users.create_index("email", unique=True),
+        db.chat_messages.create_index([("student_id", 1), ("timestamp", -1)]),
+        db.chat_messages.create_index([("student_id", 1), ("subject", 1), ("timestamp", -1)]),
+        db.chat_sessions.create_index([("student_id", 1), ("last_active", -1)]),
+        db.student_profiles.create_index("user_id", unique=True),
+        db.student_profiles.create_index("last_active"),
+        db.classrooms.create_index([("join_code", 1), ("is_active", 1)]),
+        db.classrooms.create_index("teacher_id"),
+        db.classrooms.create_index("class_id", unique=True),
+        db.notifications.create_index([("recipient_id", 1), ("created_at", -1)]),
+        db.notifications.create_index("id"),
+        db.calendar_events.create_index([("student_id", 1), ("start_time", 1)]),
+        db.practice_questions.create_index("id", unique=True),
+        db.mindfulness_activities.create_index([("student_id", 1), ("completed_at", -1)]),
+        db.alerts.create_index([("teacher_id", 1), ("student_id", 1), ("alert_type", 1), ("is_read", 1)]),
+    )
+
+@app.on_event("startup")
+async def start_chat_writer():
+    global _chat_write_queue, _chat_writer_task
+    _chat_write_queue = asyncio.Queue()
+    _chat_writer_task = asyncio.create_task(_chat_message_writer())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    global _chat_write_queue
+    queue, _chat_write_queue = _chat_write_queue, None
+    if _chat_writer_task:
+        _chat_writer_task.cancel()
+    # Flush anything the writer had not drained yet
+    pending = []
+    while queue and not queue.empty():
+        pending.append(queue.get_nowait())
+    if pending:
+        await db.chat_messages.insert_many([doc for doc, _ in pending], ordered=False)
+        for _, future in pending:
+            if not future.done():
+                future.set_result(None)
+    if client:
+        client.close()